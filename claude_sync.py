@@ -6,8 +6,11 @@ Syncs Claude Code sessions from ~/.claude/__store.db into Elia's database
 at ~/.local/share/elia/elia.sqlite for unified session history.
 """
 
+import logging
+import signal
 import sqlite3
-import json
+import sys
+import threading
 import time
 from datetime import datetime, timezone
 from pathlib import Path
@@ -16,6 +19,10 @@ from dataclasses import dataclass
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+from elia_chat.json_codec import dumps as _json_dumps
+
+logger = logging.getLogger(__name__)
+
 @dataclass
 class ClaudeSession:
     session_id: str
@@ -27,155 +34,285 @@ class ClaudeSession:
     total_cost: float
     summary: Optional[str] = None
 
+# Statements issued on every sync. Keeping the text fixed lets the
+# long-lived Elia connection reuse its prepared statements between syncs.
+# GLOB (unlike LIKE) is case-sensitive, so SQLite can answer the
+# claude-code:* prefix match from the chat.model index.
+_SQL_SELECT_SYNCED_CHATS = "SELECT model, id FROM chat WHERE model GLOB 'claude-code:*'"
+_SQL_INSERT_CHAT = """
+    INSERT INTO chat (model, title, started_at, archived)
+    VALUES (?, ?, ?, FALSE)
+"""
+_SQL_INSERT_SUMMARY_MESSAGE = """
+    INSERT INTO message (chat_id, role, content, timestamp, meta)
+    VALUES (?, 'assistant', ?, ?, ?)
+"""
+_SQL_UPDATE_CHAT = """
+    UPDATE chat SET 
+        title = ?,
+        started_at = ?,
+        archived = FALSE
+    WHERE id = ?
+"""
+
+_SUMMARY_CONTENT_TEMPLATE = "📝 Session Summary: {0}"
+
+def _make_summary_message(chat_id: int, session: ClaudeSession) -> Tuple:
+    """Build the (chat_id, content, timestamp, meta) parameters for a summary message"""
+    return (
+        chat_id,
+        _SUMMARY_CONTENT_TEMPLATE.format(session.summary),
+        session.last_message_time.isoformat(),
+        _json_dumps({
+            "type": "session_summary",
+            "project_path": session.project_path,
+            "message_count": session.message_count,
+            "total_cost": session.total_cost
+        }),
+    )
+
 class ClaudeEliaSync:
     def __init__(self):
         self.claude_db_path = Path.home() / ".claude" / "__store.db"
         self.elia_db_path = Path.home() / ".local/share/elia/elia.sqlite"
+        self._claude_conn: Optional[sqlite3.Connection] = None
+        self._elia_conn: Optional[sqlite3.Connection] = None
+        # Highest base_messages rowid seen by the last sync. Message
+        # timestamps aren't insertion order (a session can commit a message
+        # stamped earlier than one already synced), so rowids are the
+        # incremental watermark.
+        self.last_synced_rowid: Optional[int] = None
+    
+    @property
+    def claude_conn(self) -> sqlite3.Connection:
+        """Connection to Claude Code's database, opened on first use and reused"""
+        if self._claude_conn is None:
+            # Syncs run on the watchdog observer thread as well as the main thread
+            self._claude_conn = sqlite3.connect(
+                str(self.claude_db_path), check_same_thread=False
+            )
+        return self._claude_conn
+    
+    @property
+    def elia_conn(self) -> sqlite3.Connection:
+        """Connection to Elia's database, opened on first use and reused"""
+        if self._elia_conn is None:
+            # Autocommit mode: sync_to_elia manages its own transaction
+            conn = sqlite3.connect(
+                str(self.elia_db_path), isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA cache_size=-65536")
+            # Extend Elia schema if needed, once per connection
+            self._ensure_elia_schema(conn.cursor())
+            self._elia_conn = conn
+        return self._elia_conn
+    
+    def close(self):
+        """Close any open database connections"""
+        for conn in (self._claude_conn, self._elia_conn):
+            if conn is not None:
+                conn.close()
+        self._claude_conn = None
+        self._elia_conn = None
         
-    def get_claude_sessions(self) -> List[ClaudeSession]:
-        """Extract session metadata from Claude Code database"""
-        sessions = []
+    def get_claude_max_rowid(self) -> Optional[int]:
+        """Return the highest base_messages rowid, or None if there are none"""
+        if not self.claude_db_path.exists():
+            return None
+        cursor = self.claude_conn.cursor()
+        try:
+            cursor.execute("SELECT MAX(rowid) FROM base_messages")
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+    
+    def get_claude_sessions(self, since: Optional[int] = None) -> List[ClaudeSession]:
+        """Extract session metadata from Claude Code database
         
+        Sessions are ordered most recently active first. If `since` is given,
+        only sessions with a message inserted after that base_messages rowid
+        are returned (each still aggregated over all its messages).
+        """
         if not self.claude_db_path.exists():
-            print(f"Claude database not found at {self.claude_db_path}")
-            return sessions
+            logger.warning("Claude database not found at %s", self.claude_db_path)
+            return []
             
-        conn = sqlite3.connect(str(self.claude_db_path))
-        cursor = conn.cursor()
+        cursor = self.claude_conn.cursor()
         
-        # Get session summary with aggregated metadata
-        query = """
-        SELECT 
-            bm.session_id,
-            bm.cwd,
-            COUNT(*) as message_count,
-            MIN(bm.timestamp) as first_timestamp,
-            MAX(bm.timestamp) as last_timestamp,
-            COALESCE(SUM(am.cost_usd), 0) as total_cost
-        FROM base_messages bm
-        LEFT JOIN assistant_messages am ON bm.uuid = am.uuid
-        GROUP BY bm.session_id, bm.cwd
-        ORDER BY MAX(bm.timestamp) DESC
-        """
+        # Summaries are keyed by the leaf_uuid of a session's most recent
+        # message, not by session_id, and the table may not exist yet
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master "
+            "WHERE type = 'table' AND name = 'conversation_summaries'"
+        )
+        if cursor.fetchone():
+            summary_expr = (
+                "(SELECT cs.summary FROM conversation_summaries cs "
+                "WHERE cs.leaf_uuid = l.uuid LIMIT 1)"
+            )
+        else:
+            summary_expr = "NULL"  # No summaries available
         
-        cursor.execute(query)
-        rows = cursor.fetchall()
+        # Restrict to recently active sessions for incremental syncs. The
+        # filter is applied to every scan of base_messages, including the
+        # window below, so an incremental sync only touches those sessions.
+        session_filter = ""
+        params: Dict[str, int] = {}
+        if since is not None:
+            session_filter = """
+                WHERE session_id IN (
+                    SELECT session_id FROM base_messages WHERE rowid > :since
+                )"""
+            params = {"since": since}
         
-        for row in rows:
-            session_id, cwd, msg_count, first_ts, last_ts, cost = row
-            
-            # Convert Unix timestamps to datetime
-            first_time = datetime.fromtimestamp(first_ts, tz=timezone.utc)
-            last_time = datetime.fromtimestamp(last_ts, tz=timezone.utc)
-            
-            # Extract project name from path
-            project_name = Path(cwd).name if cwd else "Unknown"
-            
-            # Get session summary if available - summaries are keyed by leaf_uuid, not session_id
-            summary = None
-            try:
-                # Get the most recent message uuid for this session to find summary
-                cursor.execute("""
-                    SELECT bm2.uuid FROM base_messages bm2 
-                    WHERE bm2.session_id = ? 
-                    ORDER BY bm2.timestamp DESC LIMIT 1
-                """, (session_id,))
-                latest_msg = cursor.fetchone()
-                if latest_msg:
-                    cursor.execute("SELECT summary FROM conversation_summaries WHERE leaf_uuid = ?", (latest_msg[0],))
-                    summary_row = cursor.fetchone()
-                    summary = summary_row[0] if summary_row else None
-            except sqlite3.Error:
-                pass  # No summaries available
-            
-            sessions.append(ClaudeSession(
-                session_id=session_id,
-                project_path=cwd,
-                project_name=project_name,
-                first_message_time=first_time,
-                last_message_time=last_time,
-                message_count=msg_count,
-                total_cost=cost,
-                summary=summary
-            ))
+        # Aggregate each session first and only then look up its summary, so
+        # the summary subquery runs once per session rather than being part
+        # of the GROUP BY. Each session's latest message is resolved with a
+        # window function in the same pass.
+        query = f"""
+        WITH latest AS (
+            SELECT session_id, uuid
+            FROM (
+                SELECT
+                    session_id,
+                    uuid,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY session_id ORDER BY timestamp DESC
+                    ) AS rn
+                FROM base_messages{session_filter}
+            )
+            WHERE rn = 1
+        ),
+        stats AS (
+            SELECT 
+                bm.session_id,
+                bm.cwd,
+                COUNT(*) as message_count,
+                MIN(bm.timestamp) as first_timestamp,
+                MAX(bm.timestamp) as last_timestamp,
+                COALESCE(SUM(am.cost_usd), 0) as total_cost
+            FROM (SELECT * FROM base_messages{session_filter}) bm
+            LEFT JOIN assistant_messages am ON bm.uuid = am.uuid
+            GROUP BY bm.session_id, bm.cwd
+        )
+        SELECT
+            st.session_id,
+            st.cwd,
+            st.message_count,
+            st.first_timestamp,
+            st.last_timestamp,
+            st.total_cost,
+            {summary_expr} AS summary
+        FROM stats st
+        LEFT JOIN latest l ON l.session_id = st.session_id
+        ORDER BY st.last_timestamp DESC
+        """
         
-        conn.close()
-        return sessions
+        cursor.execute(query, params)
+        
+        # Bind hot lookups locally; this runs once per Claude session
+        from_timestamp = datetime.fromtimestamp
+        utc = timezone.utc
+        try:
+            # Build sessions straight from the cursor, without an
+            # intermediate fetchall() list of rows
+            return [
+                ClaudeSession(
+                    session_id=session_id,
+                    project_path=cwd,
+                    # Extract project name from path (Path(cwd).name without
+                    # building a PurePath per session)
+                    project_name=cwd.rstrip("/").rpartition("/")[2] if cwd else "Unknown",
+                    first_message_time=from_timestamp(first_ts, tz=utc),
+                    last_message_time=from_timestamp(last_ts, tz=utc),
+                    message_count=msg_count,
+                    total_cost=cost,
+                    summary=summary,
+                )
+                for session_id, cwd, msg_count, first_ts, last_ts, cost, summary in cursor
+            ]
+        finally:
+            cursor.close()
     
-    def sync_to_elia(self) -> Dict[str, int]:
-        """Sync Claude sessions to Elia database"""
+    def sync_to_elia(self, since: Optional[int] = None) -> Dict[str, int]:
+        """Sync Claude sessions to Elia database
+        
+        If `since` is given, only sessions with messages inserted after that
+        base_messages rowid are synced (see `get_claude_sessions`).
+        """
         results = {"imported": 0, "updated": 0, "skipped": 0}
         
         if not self.elia_db_path.exists():
-            print(f"Elia database not found at {self.elia_db_path}")
+            logger.warning("Elia database not found at %s", self.elia_db_path)
             return results
             
-        claude_sessions = self.get_claude_sessions()
+        # Read Claude's database before taking Elia's write lock, so the
+        # aggregate query doesn't hold up other Elia writers. The watermark is
+        # taken first: rows committed in between are re-read next time rather
+        # than missed.
+        max_rowid = self.get_claude_max_rowid()
+        claude_sessions = self.get_claude_sessions(since)
         
-        conn = sqlite3.connect(str(self.elia_db_path))
+        conn = self.elia_conn
         cursor = conn.cursor()
         
-        # First, extend Elia schema if needed
-        self._ensure_elia_schema(cursor)
-        
-        for session in claude_sessions:
-            # Check if session already exists
-            cursor.execute(
-                "SELECT id FROM chat WHERE model LIKE ? AND title LIKE ?",
-                (f"claude-code:{session.session_id}%", f"%{session.project_name}%")
-            )
-            existing = cursor.fetchone()
+        # Take the write lock up front so the whole sync is one transaction
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            # Prefetch every already-synced session in one scan. The chat model
+            # "claude-code:<session_id>" is the natural key for a synced session.
+            cursor.execute(_SQL_SELECT_SYNCED_CHATS)
+            existing = dict(cursor.fetchall())
             
-            if existing:
-                # Update existing session
-                chat_id = existing[0]
-                cursor.execute("""
-                    UPDATE chat SET 
-                        title = ?,
-                        started_at = ?,
-                        archived = FALSE
-                    WHERE id = ?
-                """, (
-                    self._generate_session_title(session),
-                    session.first_message_time.isoformat(),
-                    chat_id
-                ))
-                results["updated"] += 1
+            updates = []
+            new_chats = []
+            new_summaries = []
+            for session in claude_sessions:
+                model = f"claude-code:{session.session_id}"
+                title = self._generate_session_title(session)
+                started_at = session.first_message_time.isoformat()
+                chat_id = existing.get(model)
                 
-            else:
-                # Create new session entry
-                cursor.execute("""
-                    INSERT INTO chat (model, title, started_at, archived)
-                    VALUES (?, ?, ?, FALSE)
-                """, (
-                    f"claude-code:{session.session_id}",
-                    self._generate_session_title(session),
-                    session.first_message_time.isoformat()
-                ))
-                
-                chat_id = cursor.lastrowid
-                
-                # Add summary message if available
-                if session.summary:
-                    cursor.execute("""
-                        INSERT INTO message (chat_id, role, content, timestamp, meta)
-                        VALUES (?, 'assistant', ?, ?, ?)
-                    """, (
-                        chat_id,
-                        f"📝 Session Summary: {session.summary}",
-                        session.last_message_time.isoformat(),
-                        json.dumps({
-                            "type": "session_summary",
-                            "project_path": session.project_path,
-                            "message_count": session.message_count,
-                            "total_cost": session.total_cost
-                        })
-                    ))
-                
-                results["imported"] += 1
+                if chat_id is not None:
+                    # Update existing session
+                    updates.append((title, started_at, chat_id))
+                else:
+                    # Create new session entry
+                    new_chats.append((model, title, started_at))
+                    
+                    # Add summary message if available
+                    if session.summary:
+                        new_summaries.append((model, session))
+            
+            cursor.executemany(_SQL_INSERT_CHAT, new_chats)
+            
+            if new_summaries:
+                # Resolve the ids assigned to the chats inserted above
+                cursor.execute(_SQL_SELECT_SYNCED_CHATS)
+                existing = dict(cursor.fetchall())
+                cursor.executemany(_SQL_INSERT_SUMMARY_MESSAGE, [
+                    _make_summary_message(existing[model], session)
+                    for model, session in new_summaries
+                ])
+            
+            cursor.executemany(_SQL_UPDATE_CHAT, updates)
+            
+            cursor.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                cursor.execute("ROLLBACK")
+            raise
+        finally:
+            cursor.close()
+        
+        results["imported"] += len(new_chats)
+        results["updated"] += len(updates)
         
-        conn.commit()
-        conn.close()
+        if max_rowid is not None:
+            self.last_synced_rowid = max_rowid
         
         return results
     
@@ -188,70 +325,133 @@ class ClaudeEliaSync:
             
             if 'meta' not in columns:
                 cursor.execute("ALTER TABLE message ADD COLUMN meta TEXT DEFAULT '{}'")
+            
+            # Synced sessions are looked up by model. Not unique: regular
+            # Elia chats share model names.
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_chat_model ON chat (model)")
                 
         except sqlite3.Error as e:
-            print(f"Schema extension warning: {e}")
+            logger.warning("Schema extension warning: %s", e)
     
     def _generate_session_title(self, session: ClaudeSession) -> str:
         """Generate readable title for Claude Code session"""
-        if session.summary:
+        summary = session.summary
+        if summary:
             # Use first 50 chars of summary
-            title = session.summary[:50]
-            if len(session.summary) > 50:
-                title += "..."
-            return f"🔧 {title}"
-        else:
-            return f"🔧 {session.project_name} ({session.message_count} messages)"
+            return "🔧 " + (summary[:50] + "..." if len(summary) > 50 else summary)
+        return f"🔧 {session.project_name} ({session.message_count} messages)"
 
 class ClaudeDatabaseWatcher(FileSystemEventHandler):
-    """Watch Claude Code database for changes"""
+    """Watch Claude Code database for changes
+    
+    Bursts of change events are coalesced: each event restarts a short
+    debounce timer, and only sessions with messages added since the last
+    sync are re-read when it fires. A steady stream of events can't
+    postpone the sync forever: it fires at the latest `sync_cooldown`
+    seconds after the first event it covers.
+    """
     
     def __init__(self, sync_service: ClaudeEliaSync):
         self.sync_service = sync_service
-        self.last_sync = 0
-        self.sync_cooldown = 5  # seconds
+        self.last_sync = 0.0
+        self.sync_cooldown = 5  # seconds, minimum interval between syncs
+        self.debounce_delay = 0.5  # seconds of quiet before syncing
+        self._pending_timer: Optional[threading.Timer] = None
+        self._pending_since: Optional[float] = None  # first unsynced event
+        self._timer_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._cancelled = False
     
     def on_modified(self, event):
         if event.is_directory:
             return
             
         if event.src_path.endswith("__store.db"):
-            current_time = time.time()
-            if current_time - self.last_sync > self.sync_cooldown:
-                print(f"Claude database changed, syncing...")
-                results = self.sync_service.sync_to_elia()
-                print(f"Sync results: {results}")
-                self.last_sync = current_time
+            with self._timer_lock:
+                if self._cancelled:
+                    return
+                now = time.monotonic()
+                if self._pending_since is None:
+                    self._pending_since = now
+                if self._pending_timer is not None:
+                    self._pending_timer.cancel()
+                delay = max(
+                    self.debounce_delay,
+                    self.last_sync + self.sync_cooldown - now,
+                )
+                # Cap the wait so continuous writes still get synced
+                max_wait = self._pending_since + self.sync_cooldown - now
+                delay = max(0.0, min(delay, max_wait))
+                self._pending_timer = threading.Timer(delay, self._flush)
+                self._pending_timer.daemon = True
+                self._pending_timer.start()
+    
+    def cancel(self):
+        """Cancel any pending sync and wait for a running one to finish
+        
+        No sync runs after this returns, so the sync service's connections
+        can be closed safely.
+        """
+        with self._timer_lock:
+            self._cancelled = True
+            if self._pending_timer is not None:
+                self._pending_timer.cancel()
+                self._pending_timer = None
+            self._pending_since = None
+        # A timer that already fired may be mid-sync; wait it out
+        with self._sync_lock:
+            pass
+    
+    def _flush(self):
+        with self._sync_lock:
+            with self._timer_lock:
+                if self._cancelled:
+                    return
+                # Events from here on are covered by the next sync
+                self._pending_since = None
+            self.last_sync = time.monotonic()
+            logger.info("Claude database changed, syncing...")
+            results = self.sync_service.sync_to_elia(
+                since=self.sync_service.last_synced_rowid
+            )
+            logger.info("Sync results: %s", results)
 
 def main():
     """Main sync service entry point"""
+    # Status lines go to stdout, as the sync service has always printed them
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
     sync_service = ClaudeEliaSync()
-    
-    # Initial sync
-    print("Performing initial sync...")
-    results = sync_service.sync_to_elia()
-    print(f"Initial sync completed: {results}")
-    
-    # Setup file watcher
-    event_handler = ClaudeDatabaseWatcher(sync_service)
-    observer = Observer()
-    
-    claude_dir = Path.home() / ".claude"
-    if claude_dir.exists():
-        observer.schedule(event_handler, str(claude_dir), recursive=False)
-        observer.start()
-        print(f"Watching Claude database at {claude_dir}")
+    try:
+        # Initial sync
+        logger.info("Performing initial sync...")
+        results = sync_service.sync_to_elia()
+        logger.info("Initial sync completed: %s", results)
         
-        try:
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            observer.stop()
-            print("Stopping sync service...")
+        # Setup file watcher
+        event_handler = ClaudeDatabaseWatcher(sync_service)
+        observer = Observer()
         
-        observer.join()
-    else:
-        print(f"Claude directory not found at {claude_dir}")
+        claude_dir = Path.home() / ".claude"
+        if claude_dir.exists():
+            observer.schedule(event_handler, str(claude_dir), recursive=False)
+            observer.start()
+            logger.info("Watching Claude database at %s", claude_dir)
+            
+            # Block on an Event rather than polling so the process stays
+            # idle until SIGINT/SIGTERM asks it to stop.
+            stop = threading.Event()
+            signal.signal(signal.SIGINT, lambda *_: stop.set())
+            signal.signal(signal.SIGTERM, lambda *_: stop.set())
+            stop.wait()
+
+            logger.info("Stopping sync service...")
+            observer.stop()
+            event_handler.cancel()
+            observer.join()
+        else:
+            logger.warning("Claude directory not found at %s", claude_dir)
+    finally:
+        sync_service.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -6,7 +6,7 @@ import asyncio
 import pathlib
 from textwrap import dedent
 import tomllib
-from typing import Any
+from typing import Any, Coroutine, TypeVar
 
 import click
 from click_default_group import DefaultGroup
@@ -16,15 +16,38 @@ from rich.console import Console
 from elia_chat.app import Elia
 from elia_chat.config import LaunchConfig
 from elia_chat.database.import_chatgpt import import_chatgpt_data
-from elia_chat.database.database import create_database, sqlite_file_name
+from elia_chat.database.database import (
+    create_database,
+    create_missing_indexes,
+    engine,
+    sqlite_file_name,
+)
 from elia_chat.locations import config_file
 
 console = Console()
 
+T = TypeVar("T")
+
+def run_db(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine that uses the database in a new event loop.
+
+    The engine is disposed before the loop closes, even if the coroutine
+    fails: pooled aiosqlite connections would otherwise keep the process alive.
+    """
+    async def run() -> T:
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
 def create_db_if_not_exists() -> None:
     if not sqlite_file_name.exists():
         click.echo(f"Creating database at {sqlite_file_name!r}")
-        asyncio.run(create_database())
+        run_db(create_database())
+    else:
+        run_db(create_missing_indexes())
 
 def load_or_create_config_file() -> dict[str, Any]:
     config = config_file()
@@ -40,6 +63,17 @@ def load_or_create_config_file() -> dict[str, Any]:
 
     return file_config
 
+def use_uvloop_if_available() -> None:
+    """Run the app on uvloop when it's installed, otherwise keep asyncio's loop.
+
+    uvloop comes with the optional `speedups` extra (not available on Windows).
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
 @click.group(cls=DefaultGroup, default="default", default_if_no_args=True)
 def cli() -> None:
     """Cafedelia - AI session management for terminal developers."""
@@ -71,6 +105,7 @@ def default(prompt: tuple[str, ...], model: str, inline: bool) -> None:
 
     launch_config: dict[str, Any] = {**file_config, **cli_config}
     app = Elia(LaunchConfig(**launch_config), startup_prompt=joined_prompt)
+    use_uvloop_if_available()
     app.run(inline=inline)
 
 @cli.command()
@@ -101,7 +136,7 @@ You may wish to create a backup of \
     )
     if click.confirm("Delete all chats?", abort=True):
         sqlite_file_name.unlink(missing_ok=True)
-        asyncio.run(create_database())
+        run_db(create_database())
         console.print(f"♻️  Database reset @ {sqlite_file_name}")
 
 @cli.command("import")
@@ -118,7 +153,7 @@ def import_file_to_db(file: pathlib.Path) -> None:
     This command will import the ChatGPT conversations from a local
     JSON file into the database.
     """
-    asyncio.run(import_chatgpt_data(file=file))
+    run_db(import_chatgpt_data(file=file))
     console.print(f"[green]ChatGPT data imported from {str(file)!r}")
 
 if __name__ == "__main__":
@@ -12,6 +12,7 @@ from textual.signal import Signal
 from elia_chat.chats_manager import ChatsManager
 from elia_chat.models import ChatData, ChatMessage
 from elia_chat.config import EliaChatModel, LaunchConfig
+from elia_chat.database.database import engine
 from elia_chat.runtime_config import RuntimeConfig
 from elia_chat.screens.chat_screen import ChatScreen
 from elia_chat.screens.help_screen import HelpScreen
@@ -41,6 +42,11 @@ class Elia(App[None]):
 
         self.themes: dict[str, Theme] = available_themes
 
+        self._color_system_cache: dict[str, dict[str, str]] = {}
+        """Generated color systems, keyed by theme name."""
+        self._applied_color_system: dict[str, str] = {}
+        """The color system the current CSS was last refreshed with."""
+
         self._runtime_config = RuntimeConfig(
             selected_model=config.default_model_object,
             system_prompt=config.system_prompt,
@@ -80,6 +86,9 @@ class Elia(App[None]):
                 model=self.runtime_config.selected_model,
             )
 
+    async def on_unmount(self) -> None:
+        await engine.dispose()
+
     async def launch_chat(self, prompt: str, model: EliaChatModel) -> None:
         current_time = datetime.datetime.now(datetime.timezone.utc)
         system_message: ChatCompletionSystemMessageParam = {
@@ -117,19 +126,30 @@ class Elia(App[None]):
         else:
             await self.push_screen(HelpScreen())
 
-    def get_css_variables(self) -> dict[str, str]:
-        if self.theme:
-            theme = self.themes.get(self.theme)
-            if theme:
-                color_system = theme.to_color_system().generate()
-            else:
-                color_system = {}
-        else:
-            color_system = {}
+    def _get_color_system(self, theme_name: str | None) -> dict[str, str]:
+        """Return the CSS variables generated for a theme (empty if unknown)."""
+        if not theme_name:
+            return {}
+
+        color_system = self._color_system_cache.get(theme_name)
+        if color_system is None:
+            theme = self.themes.get(theme_name)
+            if not theme:
+                return {}
+            color_system = theme.to_color_system().generate()
+            self._color_system_cache[theme_name] = color_system
+        return color_system
 
+    def get_css_variables(self) -> dict[str, str]:
+        color_system = self._get_color_system(self.theme)
         return {**super().get_css_variables(), **color_system}
 
     def watch_theme(self, theme: str | None) -> None:
+        color_system = self._get_color_system(theme)
+        if color_system == self._applied_color_system:
+            # Nothing visible would change, so skip re-walking the styles.
+            return
+        self._applied_color_system = color_system
         self.refresh_css(animate=False)
         self.screen._update_styles()
 
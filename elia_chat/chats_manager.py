@@ -13,7 +13,7 @@ from elia_chat.database.converters import (
 )
 from elia_chat.database.database import get_session
 from elia_chat.database.models import ChatDao, MessageDao
-from elia_chat.models import ChatData, ChatMessage
+from elia_chat.models import ChatData, ChatMessage, get_model
 
 
 @dataclass
@@ -51,7 +51,7 @@ class ChatsManager:
             await session.commit()
 
         # Convert MessageDao objects to ChatMessages
-        model = chat.model
+        model = get_model(chat.model)
         chat_messages: list[ChatMessage] = []
         for message_dao in message_daos:
             chat_message = message_dao_to_chat_message(message_dao, model)
@@ -73,21 +73,25 @@ class ChatsManager:
                 started_at=datetime.datetime.now(datetime.timezone.utc),
             )
             session.add(chat)
-            await session.commit()
+            await session.flush()  # Flush so that chat.id is assigned
 
             chat_id = chat.id
+            new_messages: list[MessageDao] = []
             for message in chat_data.messages:
                 litellm_message = message.message
                 content = litellm_message["content"]
-                new_message = MessageDao(
-                    chat_id=chat_id,
-                    role=litellm_message["role"],
-                    content=content if isinstance(content, str) else "",
-                    model=lookup_key,
-                    timestamp=message.timestamp,
+                new_messages.append(
+                    MessageDao(
+                        chat_id=chat_id,
+                        role=litellm_message["role"],
+                        content=content if isinstance(content, str) else "",
+                        model=lookup_key,
+                        timestamp=message.timestamp,
+                    )
                 )
-                (await chat.awaitable_attrs.messages).append(new_message)
+            session.add_all(new_messages)
 
+            # The chat and its initial messages are written in one transaction.
             await session.commit()
 
         return chat.id
@@ -108,6 +112,7 @@ class ChatsManager:
             if not chat:
                 raise Exception(f"Chat with ID {chat_id} not found.")
             message_dao = chat_message_to_message_dao(message, chat_id)
-            (await chat.awaitable_attrs.messages).append(message_dao)
-            session.add(chat)
+            # Add the row directly: appending to chat.messages would first
+            # load the chat's entire message history.
+            session.add(message_dao)
             await session.commit()
@@ -1,4 +1,6 @@
 import os
+from functools import cached_property
+
 from pydantic import AnyHttpUrl, BaseModel, ConfigDict, Field, SecretStr
 
 
@@ -175,6 +177,14 @@ class LaunchConfig(BaseModel):
     def all_models(self) -> list[EliaChatModel]:
         return self.models + self.builtin_models
 
+    @cached_property
+    def models_by_id(self) -> dict[str | None, EliaChatModel]:
+        return {model.id: model for model in self.all_models}
+
+    @cached_property
+    def models_by_name(self) -> dict[str, EliaChatModel]:
+        return {model.name: model for model in self.all_models}
+
     @property
     def default_model_object(self) -> EliaChatModel:
         from elia_chat.models import get_model
@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING, Any
 
 
+from elia_chat.config import EliaChatModel
 from elia_chat.database.models import ChatDao, MessageDao
 from elia_chat.models import ChatData, ChatMessage, get_model
 
@@ -27,11 +28,12 @@ def chat_message_to_message_dao(
 
 def chat_dao_to_chat_data(chat_dao: ChatDao) -> ChatData:
     """Convert the SQLModel chat to a ChatData."""
-    model = chat_dao.model
+    # Every message in a chat shares the chat's model, so resolve it once.
+    model = get_model(chat_dao.model)
     return ChatData(
         id=chat_dao.id,
         title=chat_dao.title,
-        model=get_model(model),
+        model=model,
         create_timestamp=chat_dao.started_at if chat_dao.started_at else None,
         messages=[
             message_dao_to_chat_message(message, model) for message in chat_dao.messages
@@ -39,7 +41,9 @@ def chat_dao_to_chat_data(chat_dao: ChatDao) -> ChatData:
     )
 
 
-def message_dao_to_chat_message(message_dao: MessageDao, model: str) -> ChatMessage:
+def message_dao_to_chat_message(
+    message_dao: MessageDao, model: EliaChatModel
+) -> ChatMessage:
     """Convert the SQLModel message to a ChatMessage."""
     message: ChatCompletionUserMessageParam = {
         "content": message_dao.content,
@@ -49,5 +53,5 @@ def message_dao_to_chat_message(message_dao: MessageDao, model: str) -> ChatMess
     return ChatMessage(
         message=message,
         timestamp=message_dao.timestamp,
-        model=get_model(model),
+        model=model,
     )
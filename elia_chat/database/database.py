@@ -1,15 +1,46 @@
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+import json
+from typing import Any, AsyncGenerator
 from sqlmodel import SQLModel
+from elia_chat import json_codec
 from elia_chat.locations import data_directory
 
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import Connection, event
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 
 sqlite_file_name = data_directory() / "cafedelia.sqlite"
 sqlite_url = f"sqlite+aiosqlite:///{sqlite_file_name}"
-engine = create_async_engine(sqlite_url)
+# Keep a few connections open between sessions instead of reconnecting (and
+# re-running the pragmas below) for every query. aiosqlite connections are
+# bound to the event loop that opened them and keep the process alive, so
+# engine.dispose() must be awaited before each loop the engine is used in ends
+# (see run_db in __main__.py and Elia.on_unmount).
+engine = create_async_engine(
+    sqlite_url,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=5,
+    max_overflow=10,
+    # Rows may hold NaN/Infinity written by json.dumps, which orjson won't
+    # read back, so only serialization goes through the orjson fast path.
+    json_serializer=json_codec.dumps,
+    json_deserializer=json.loads,
+)
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+    # These are per-connection settings (only journal_mode persists in the
+    # file), so they're applied whenever the pool opens a new connection.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
 
 
 async def create_database():
@@ -18,10 +49,28 @@ async def create_database():
         await conn.run_sync(SQLModel.metadata.create_all)
 
 
+def _create_missing_indexes(connection: Connection) -> None:
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+async def create_missing_indexes():
+    """Add any indexes declared on the models that an existing database lacks.
+
+    create_all() only builds indexes along with new tables, so indexes added
+    to a model later never reach databases created before them.
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(_create_missing_indexes)
+
+
+async_session = async_sessionmaker(
+    engine, class_=AsyncSession, expire_on_commit=False
+)
+
+
 @asynccontextmanager
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async_session = async_sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
-    )
     async with async_session() as session:
         yield session
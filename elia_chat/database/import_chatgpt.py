@@ -1,20 +1,29 @@
-import json
+import asyncio
+import time
 from datetime import datetime
 from pathlib import Path
+from typing import Any
 
 from rich.console import Console
 from rich.live import Live
 from rich.text import Text
 
+from elia_chat import json_codec
 from elia_chat.database.database import get_session
 from elia_chat.database.models import MessageDao, ChatDao
 
 
+def _load_chatgpt_export(file: Path) -> list[dict[str, Any]]:
+    # Both parsers accept the raw UTF-8 bytes, which saves decoding to str first.
+    with open(file, "rb") as f:
+        return json_codec.loads(f.read())
+
+
 async def import_chatgpt_data(file: Path) -> None:
     console = Console()
 
-    with open(file, "r") as f:
-        data = json.load(f)
+    # Reading and parsing a large export blocks, so keep it off the event loop.
+    data = await asyncio.to_thread(_load_chatgpt_export, file)
 
     console.print("[green]Loaded and parsed JSON.")
 
@@ -29,7 +38,11 @@ async def import_chatgpt_data(file: Path) -> None:
         )
 
     message_count = 0
+    next_update = 0.0
     with Live(output_progress(0, len(data), message_count)) as live:
+        # Building the progress Text parses markup, so only do it as often
+        # as the live display actually redraws rather than for every message.
+        update_interval = 1 / live.refresh_per_second
         async with get_session() as session:
             for chat_number, chat_data in enumerate(data, start=1):
                 chat = ChatDao(
@@ -40,9 +53,7 @@ async def import_chatgpt_data(file: Path) -> None:
                     ),
                 )
                 session.add(chat)
-                await (
-                    session.commit()
-                )  # Make sure to commit so that chat.id is assigned
+                await session.flush()  # Flush so that chat.id is assigned
 
                 for _message_id, message_data in chat_data["mapping"].items():
                     message_info = message_data.get("message")
@@ -54,8 +65,6 @@ async def import_chatgpt_data(file: Path) -> None:
                             chat.model = (
                                 "gpt-4-turbo" if model == "gpt-4" else "gpt-3.5-turbo"
                             )
-                            session.add(chat)
-                            await session.commit()
 
                         role = message_info["author"]["role"]
                         chat_id = chat.id
@@ -71,15 +80,22 @@ async def import_chatgpt_data(file: Path) -> None:
                         )
                         session.add(message)
                         message_count += 1
-                        live.update(
-                            output_progress(chat_number, len(data), message_count)
-                        )
+                        now = time.monotonic()
+                        if now >= next_update:
+                            live.update(
+                                output_progress(chat_number, len(data), message_count)
+                            )
+                            next_update = now + update_interval
+
+            # Commit the whole import at once rather than once per chat.
+            await session.commit()
 
-                await session.commit()
+        live.update(output_progress(len(data), len(data), message_count))
 
 
 if __name__ == "__main__":
+    from elia_chat.__main__ import run_db
+
     path = Path("resources/conversations.json")
-    import asyncio
 
-    asyncio.run(import_chatgpt_data(path))
+    run_db(import_chatgpt_data(path))
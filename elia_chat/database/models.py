@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Any, Optional
 
-from sqlalchemy import Column, DateTime, func, JSON, desc
+from sqlalchemy import Column, DateTime, Index, func, JSON, desc
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import selectinload
 from sqlmodel import Field, Relationship, SQLModel, select
@@ -22,6 +22,11 @@ class SystemPromptsDao(AsyncAttrs, SQLModel, table=True):
 
 class MessageDao(AsyncAttrs, SQLModel, table=True):
     __tablename__ = "message"
+    __table_args__ = (
+        # Serves both the per-chat message lookups and the
+        # max(timestamp)-per-chat subquery used to order the chat list.
+        Index("ix_message_chat_id_timestamp", "chat_id", "timestamp"),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
     chat_id: Optional[int] = Field(foreign_key="chat.id")
@@ -0,0 +1,37 @@
+"""JSON encoding and decoding that uses orjson when it's installed.
+
+orjson comes with the optional `speedups` extra. It's stricter than the
+standard library: it can't encode integers wider than 64 bits and doesn't
+parse NaN/Infinity literals, so anything it refuses is handed on to `json`
+instead. (When encoding, orjson writes NaN and Infinity as null.)
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj: Any) -> str:
+    """Serialize `obj` to a JSON string."""
+    if orjson is not None:
+        try:
+            # Decode so the result is a str, as with json.dumps. SQLite would
+            # store bytes with BLOB rather than TEXT affinity.
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj)
+
+
+def loads(data: str | bytes) -> Any:
+    """Deserialize a JSON document from a str or UTF-8 bytes."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
@@ -1,3 +1,4 @@
+from functools import cache
 from pathlib import Path
 
 from xdg_base_dirs import xdg_config_home, xdg_data_home
@@ -9,11 +10,13 @@ def _cafedelia_directory(root: Path) -> Path:
     return directory
 
 
+@cache
 def data_directory() -> Path:
     """Return (possibly creating) the application data directory."""
     return _cafedelia_directory(xdg_data_home())
 
 
+@cache
 def config_directory() -> Path:
     """Return (possibly creating) the application config directory."""
     return _cafedelia_directory(xdg_config_home())
@@ -23,6 +26,7 @@ def config_file() -> Path:
     return config_directory() / "config.toml"
 
 
+@cache
 def theme_directory() -> Path:
     """Return (possibly creating) the themes directory."""
     theme_dir = data_directory() / "themes"
@@ -27,23 +27,23 @@ def get_model(
     if config is None:
         config = active_app.get().launch_config
     try:
-        return {model.id: model for model in config.all_models}[model_id_or_name]
+        return config.models_by_id[model_id_or_name]
     except KeyError:
         try:
-            return {model.name: model for model in config.all_models}[model_id_or_name]
+            return config.models_by_name[model_id_or_name]
         except KeyError:
             pass
     return UnknownModel(id="unknown", name="unknown model")
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatMessage:
     message: ChatCompletionMessageParam
     timestamp: datetime | None
     model: EliaChatModel
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatData:
     id: int | None  # Can be None before the chat gets assigned ID from database.
     model: EliaChatModel